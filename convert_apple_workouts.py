@@ -5,119 +5,656 @@ Combines workout metadata, heart rate data, and GPS routes from GPX files.
 """
 
 import xml.etree.ElementTree as ET
+import copy
+import math
+from xml.parsers import expat
+import mmap
 import os
 import re
-from datetime import datetime, timezone
+import sys
+from xml.sax.saxutils import unescape
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import argparse
+import functools
+import gzip
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from lxml import etree as LET
+except ImportError:  # lxml is an optional speedup; stdlib ElementTree still works
+    LET = None
+
+try:
+    import ciso8601
+except ImportError:  # optional C parser for the date fallback path
+    ciso8601 = None
+
+
+@dataclass(slots=True)
+class Workout:
+    """One parsed workout row from export.xml.
+
+    Slotted dataclass instead of a dict: thousands of rows fit in fixed
+    slot storage rather than per-row hash tables, and field access is a
+    C slot load. __getitem__ keeps the historical dict-style access used
+    by callers and tests.
+    """
+    sport: str
+    start_time: datetime
+    end_time: datetime
+    duration_minutes: float
+    heart_rate: dict | None = None
+    distance: float | None = None
+    calories: float | None = None
+    elevation_gain: float | None = None
+    gpx_file: Path | None = None
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+
+class Trackpoint:
+    """Slotted view of one Track row.
+
+    Built on demand by Track.__getitem__; slots keep the per-point cost to
+    five references, and __getitem__ preserves the dict-style access the
+    tests and older callers use.
+    """
+    __slots__ = ('lat', 'lon', 'elevation', 'time', 'speed')
+
+    def __init__(self, lat, lon, elevation, time, speed):
+        self.lat = lat
+        self.lon = lon
+        self.elevation = elevation
+        self.time = time
+        self.speed = speed
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+
+@dataclass
+class Track:
+    """Structure-of-arrays storage for the trackpoints of one GPX file.
+
+    One contiguous array per column instead of one dict (plus boxed values)
+    per point, which cuts memory by an order of magnitude on long routes and
+    lets the TCX writer batch-process whole columns.
+    """
+    lat: np.ndarray    # float64, degrees
+    lon: np.ndarray    # float64, degrees
+    ele: np.ndarray    # float64, metres
+    t: np.ndarray      # datetime64[us], UTC
+    speed: np.ndarray  # float64, NaN where the GPX carried no speed
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __getitem__(self, i):
+        """Materialize point i as a Trackpoint (convenience/compat accessor)"""
+        speed = self.speed[i]
+        return Trackpoint(
+            self.lat[i].item(),
+            self.lon[i].item(),
+            self.ele[i].item(),
+            self.t[i].item().replace(tzinfo=timezone.utc),
+            None if np.isnan(speed) else speed.item(),
+        )
+
+
+def _build_track(lats, lons, eles, times, speeds):
+    """Pack per-column accumulators into a Track.
+
+    The float columns arrive as array.array('d') buffers — contiguous C
+    doubles appended without boxing — so the NumPy wrap is one buffer copy
+    per column (the .copy() detaches from the accumulator's storage).
+    """
+    return Track(
+        np.frombuffer(lats, dtype=np.float64).copy(),
+        np.frombuffer(lons, dtype=np.float64).copy(),
+        np.frombuffer(eles, dtype=np.float64).copy(),
+        np.asarray(times, dtype='datetime64[us]'),
+        np.frombuffer(speeds, dtype=np.float64).copy(),
+    )
+
+
+def _format_position_columns(track):
+    """Vectorized float->str conversion for the position columns of a Track"""
+    lat_s = np.char.mod('%.7f', track.lat)
+    lon_s = np.char.mod('%.7f', track.lon)
+    ele_s = np.char.mod('%.2f', track.ele)
+    return lat_s, lon_s, ele_s
+
+
+def _format_time_column(track):
+    """Vectorized datetime64 -> ISO-8601 UTC strings for the Time elements"""
+    return np.char.add(np.datetime_as_string(track.t, unit='us'), 'Z')
+
+
+def _iso_utc(dt):
+    """Format a UTC datetime as ISO-8601 with a fixed template.
+
+    strftime re-parses its format string on every call; for the handful of
+    fields TCX needs, an f-string is ~3x faster.
+    """
+    return (f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
+            f"T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}.{dt.microsecond:06d}Z")
+
+
+_EARTH_RADIUS_M = 6371000.0
+
+
+def _total_distance_m_py(lat, lon):
+    """Vectorized haversine track length; fallback when Numba is unavailable"""
+    if lat.size < 2:
+        return 0.0
+    phi = np.radians(lat)
+    dphi = np.diff(phi)
+    dlam = np.radians(np.diff(lon))
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi[:-1]) * np.cos(phi[1:]) * np.sin(dlam / 2) ** 2
+    return float((2 * _EARTH_RADIUS_M * np.arcsin(np.sqrt(a))).sum())
+
+
+try:
+    from numba import njit
+
+    # Explicit signature forces compile-at-import; cache=True persists the
+    # machine code so later runs skip compilation entirely
+    @njit('float64(float64[:], float64[:])', cache=True, fastmath=True)
+    def _total_distance_m(lat, lon):
+        total = 0.0
+        for i in range(1, lat.size):
+            phi1 = math.radians(lat[i - 1])
+            phi2 = math.radians(lat[i])
+            dphi = phi2 - phi1
+            dlam = math.radians(lon[i] - lon[i - 1])
+            a = (math.sin(dphi * 0.5) ** 2
+                 + math.cos(phi1) * math.cos(phi2) * math.sin(dlam * 0.5) ** 2)
+            total += 2.0 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
+        return total
+except ImportError:  # numba is optional; NumPy keeps the math vectorized
+    _total_distance_m = _total_distance_m_py
+
+
+@functools.lru_cache(maxsize=64)
+def _tz(offset):
+    """Intern fixed-offset timezones keyed by their "+HHMM" suffix.
+
+    An export uses at most a handful of offsets, so caching avoids building
+    a fresh timedelta+timezone pair per workout; "+0000" collapses to the
+    shared timezone.utc singleton.
+    """
+    if offset == '+0000':
+        return timezone.utc
+    sign = -1 if offset[0] == '-' else 1
+    return timezone(timedelta(hours=sign * int(offset[1:3]),
+                              minutes=sign * int(offset[3:5])))
+
+
+@functools.lru_cache(maxsize=8192)
+def _parse_apple_date(date_str):
+    """Parse the fixed Apple Health date layout by slicing known offsets.
+
+    The export always uses "2022-10-06 20:04:10 +0100". fromisoformat walks
+    a generic state machine; positional int() slices are several times
+    faster, and this runs for every workout in the export. Memoized because
+    identical timestamp strings recur across a workout's attribute rows.
+    """
+    try:
+        return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]),
+                        int(date_str[11:13]), int(date_str[14:16]), int(date_str[17:19]),
+                        tzinfo=_tz(date_str[20:25]))
+    except (ValueError, IndexError):
+        # Unexpected layout; fall back to a generic parser (ciso8601's C
+        # implementation when installed, else fromisoformat)
+        if ciso8601 is not None:
+            try:
+                return ciso8601.parse_datetime(date_str)
+            except ValueError:
+                pass
+        return datetime.fromisoformat(date_str)
+
+
+# Byte-level patterns for the export.xml fast path: Apple writes Workout
+# blocks with a flat, uniform attribute layout, so a compiled scan of the
+# raw bytes can extract the few fields we need without an XML parser
+_WORKOUT_RE = re.compile(rb'<Workout\s+([^>]*?)\s*(?:/>|>(.*?)</Workout>)', re.DOTALL)
+_STAT_RE = re.compile(rb'<WorkoutStatistics\s+([^>]*?)/?>')
+_META_RE = re.compile(rb'<MetadataEntry\s+([^>]*?)/?>')
+_FILEREF_RE = re.compile(rb'<FileReference\s+([^>]*?)/?>')
+_SOURCE_RE = re.compile(rb'sourceName="([^"]*)"')
+_WORKOUT_OPEN_RE = re.compile(rb'<Workout\s')
+_ATTR_RE = re.compile(rb'([\w:]+)="([^"]*)"')
+_XML_ENTITIES = {'&quot;': '"', '&apos;': "'"}
+
+# Ceiling for the byte-scan fast path; bigger exports go straight to the
+# streaming parsers, whose constant memory matters more than raw speed there
+_FAST_SCAN_MAX_BYTES = 100 * 1024 * 1024
+
+# Namespace URIs shared by the TCX builders and the GPX parsers
+_TCX_NS = 'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2'
+_TCX_SCHEMA = 'http://www.garmin.com/xmlschemas/TrainingCenterDatabasev2.xsd'
+_XSI_NS = 'http://www.w3.org/2001/XMLSchema-instance'
+_GPX_NS = 'http://www.topografix.com/GPX/1/1'
+
+
+def _make_tcx_skeleton():
+    """Build the fixed part of a TCX document (header, activity stub, creator).
+
+    Every workout shares this structure; _build_tcx deepcopies it (a C-level
+    copy for Elements) instead of re-issuing the ~15 SubElement calls per
+    file. The namespace declarations stay plain attributes deliberately:
+    parsing them as real namespaces would prefix every tag.
+    """
+    tcx = ET.Element('TrainingCenterDatabase')
+    tcx.set('xmlns', _TCX_NS)
+    tcx.set('xmlns:xsi', _XSI_NS)
+    tcx.set('xsi:schemaLocation', f'{_TCX_NS} {_TCX_SCHEMA}')
+
+    activities = ET.SubElement(tcx, 'Activities')
+    activity = ET.SubElement(activities, 'Activity')
+    ET.SubElement(activity, 'Id')
+    lap = ET.SubElement(activity, 'Lap')
+    ET.SubElement(lap, 'TotalTimeSeconds')
+
+    creator = ET.SubElement(activity, 'Creator')
+    creator.set('xsi:type', 'Device_t')
+    ET.SubElement(creator, 'Name').text = 'Apple Watch'
+    ET.SubElement(creator, 'UnitId').text = '0'
+    ET.SubElement(creator, 'ProductID').text = '0'
+    return tcx
+
+
+_TCX_TEMPLATE = _make_tcx_skeleton()
+
+# Apple workout type -> TCX Sport element value
+_ACTIVITY_MAP = {
+    'HKWorkoutActivityTypeRunning': 'Running',
+    'HKWorkoutActivityTypeWalking': 'Walking',
+    'HKWorkoutActivityTypeCycling': 'Biking',
+    'HKWorkoutActivityTypeHiking': 'Other',
+    'HKWorkoutActivityTypeSwimming': 'Swimming',
+}
+
+
+# Attribute names draw from a fixed schema, and the values of these
+# attributes repeat across virtually every row (same watch, same units,
+# same activity identifiers), so both are worth interning: one shared str
+# per distinct value instead of a fresh decode per occurrence
+_ATTR_NAME_CACHE = {}
+_ATTR_VALUE_CACHE = {}
+_REPEATED_ATTRS = frozenset({
+    'sourceName', 'sourceVersion', 'unit', 'durationUnit',
+    'workoutActivityType', 'device', 'type', 'key',
+})
+
+
+def _parse_attrs(attr_bytes):
+    """Decode an attribute block captured by the byte-regex scan"""
+    attrs = {}
+    for name, value in _ATTR_RE.findall(attr_bytes):
+        key = _ATTR_NAME_CACHE.get(name)
+        if key is None:
+            key = _ATTR_NAME_CACHE[name] = sys.intern(name.decode('ascii'))
+        if key in _REPEATED_ATTRS:
+            text = _ATTR_VALUE_CACHE.get(value)
+            if text is None:
+                text = _ATTR_VALUE_CACHE[value] = _decode_attr_value(value)
+        else:
+            # Dates and measurements are mostly unique; caching them would
+            # only grow the table without hits
+            text = _decode_attr_value(value)
+        attrs[key] = text
+    return attrs
+
+
+def _decode_attr_value(value):
+    text = value.decode('utf-8')
+    if '&' in text:
+        text = unescape(text, _XML_ENTITIES)
+    return text
+
+
+def _clean_gpx_time(text):
+    """Strip the UTC suffix so NumPy can parse the timestamp as datetime64"""
+    if text.endswith('Z'):
+        return text[:-1]
+    if text.endswith('+00:00'):
+        return text[:-6]
+    return text
+
+class _WorkoutTarget:
+    """Expat callback handler that accumulates workouts from export.xml.
+
+    Wired straight into an expat parser; no Element objects are built at
+    all, only the attributes of the handful of tags the converter actually
+    reads, so memory stays flat on multi-GB exports.
+    """
+
+    def __init__(self, converter):
+        self._converter = converter
+        self.workouts = []
+        self.total_count = 0
+        self.apple_watch_count = 0
+        self._current = None  # attrs of the open Workout we care about
+        self._stats = None
+        self._elevation = None
+        self._gpx_path = None
+
+    def start(self, tag, attrs):
+        if tag == 'Workout':
+            source_name = attrs.get('sourceName', '')
+            if self.total_count < 5:  # Show first 5 source names for debugging
+                print(f"Workout {self.total_count}: source='{source_name}'")
+            self.total_count += 1
+            if 'Apple Watch' in source_name or 'Bharat' in source_name:
+                self.apple_watch_count += 1
+                self._current = attrs
+                self._stats = []
+                self._elevation = None
+                self._gpx_path = None
+        elif self._current is not None:
+            if tag == 'WorkoutStatistics':
+                self._stats.append(attrs)
+            elif tag == 'MetadataEntry':
+                if attrs.get('key') == 'HKElevationAscended':
+                    self._elevation = attrs.get('value', '0 cm')
+            elif tag == 'FileReference':
+                self._gpx_path = attrs.get('path', '')
+
+    def end(self, tag):
+        if tag == 'Workout' and self._current is not None:
+            workout_data = self._converter._workout_from_attrs(
+                self._current, self._stats, self._elevation, self._gpx_path)
+            if workout_data:
+                self.workouts.append(workout_data)
+            self._current = None
+
 
 class AppleWorkoutConverter:
     def __init__(self, export_dir):
         self.export_dir = Path(export_dir)
         self.export_xml = self.export_dir / "export.xml"
         self.routes_dir = self.export_dir / "workout-routes"
-        
+
+        # Directories already created this run; see _ensure_dir
+        self._mkdir_cache = set()
+
+        self._ns = {'gpx': _GPX_NS}
+        if LET is not None:
+            # Precompile the XPath expressions once instead of re-parsing the
+            # expression strings per workout/trackpoint; the source filter is
+            # a compiled predicate, so libxml2 evaluates the contains()
+            # checks without materializing the attribute in Python
+            self._workout_match = LET.XPath(
+                "contains(@sourceName,'Apple Watch') or contains(@sourceName,'Bharat')")
+            self._xp_ele = LET.XPath('./gpx:ele/text()', namespaces=self._ns)
+            self._xp_time = LET.XPath('./gpx:time/text()', namespaces=self._ns)
+            self._xp_speed = LET.XPath('./gpx:extensions/speed/text()',
+                                       namespaces=self._ns)
+
     def parse_apple_workouts(self):
-        """Parse Apple Watch workouts from export.xml"""
-        tree = ET.parse(self.export_xml)
-        root = tree.getroot()
-        
-        workouts = []
-        all_workouts = root.findall('.//Workout')
-        print(f"Found {len(all_workouts)} total workouts")
-        
-        apple_watch_count = 0
-        for i, workout in enumerate(all_workouts):
-            source_name = workout.get('sourceName', '')
-            if i < 5:  # Show first 5 source names for debugging
-                print(f"Workout {i}: source='{source_name}'")
-            if 'Apple Watch' in source_name or 'Bharat' in source_name:
+        """Parse Apple Watch workouts from export.xml as a list"""
+        return list(self.iter_apple_workouts())
+
+    def iter_apple_workouts(self):
+        """Yield Apple Watch workouts as they stream out of export.xml.
+
+        A generator instead of a list lets the caller overlap conversion work
+        with XML reading and keeps peak memory flat on huge exports.
+        """
+        parsed_count = 0
+
+        scanned = self._scan_workouts_fast()
+        if scanned is not None:
+            workouts, total_count, apple_watch_count = scanned
+            parsed_count = len(workouts)
+            yield from workouts
+        elif LET is not None:
+            total_count = 0
+            apple_watch_count = 0
+            for workout in self._iter_workout_elements():
+                if total_count < 5:  # Show first 5 source names for debugging
+                    print(f"Workout {total_count}: source='{workout.get('sourceName', '')}'")
+                total_count += 1
+                if self._workout_match(workout):
+                    apple_watch_count += 1
+                    workout_data = self.extract_workout_data(workout)
+                    if workout_data:
+                        parsed_count += 1
+                        yield workout_data
+        else:
+            # Raw expat, no ElementTree wrapper in between: the handler
+            # methods plug directly into the C parser's callbacks. Drain
+            # the target after each fed chunk so completed workouts flow
+            # out while the file is still being read.
+            target = _WorkoutTarget(self)
+            parser = expat.ParserCreate()
+            parser.buffer_text = True
+            parser.StartElementHandler = target.start
+            parser.EndElementHandler = target.end
+            try:
+                with open(self.export_xml, 'rb') as f:
+                    while chunk := f.read(1 << 20):
+                        parser.Parse(chunk, False)
+                        if target.workouts:
+                            parsed_count += len(target.workouts)
+                            yield from target.workouts
+                            target.workouts.clear()
+                parser.Parse(b'', True)
+            except expat.ExpatError as e:
+                # Match the error type the tree-based parsers raise
+                raise ET.ParseError(str(e)) from e
+            if target.workouts:
+                parsed_count += len(target.workouts)
+                yield from target.workouts
+                target.workouts.clear()
+            total_count = target.total_count
+            apple_watch_count = target.apple_watch_count
+
+        print(f"Found {total_count} total workouts")
+        print(f"Found {apple_watch_count} Apple Watch workouts")
+        print(f"Successfully parsed {parsed_count} workouts with data")
+
+    def _scan_workouts_fast(self):
+        """Extract workouts by scanning the raw export.xml bytes with regexes.
+
+        Skips XML tokenization and entity handling entirely; the export's
+        fixed schema (no nested Workout tags, uniform attribute lists) makes
+        this safe. Returns (workouts, total_count, apple_watch_count), or
+        None when the file doesn't look like a clean export — the XML rungs
+        then take over and report errors properly.
+        """
+        try:
+            with open(self.export_xml, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            if data.size() > _FAST_SCAN_MAX_BYTES:
+                return None
+            if not bytes(data[:64]).lstrip().startswith(b'<?xml'):
+                return None
+
+            workouts = []
+            total_count = 0
+            apple_watch_count = 0
+
+            for match in _WORKOUT_RE.finditer(data):
+                attr_bytes = match.group(1)
+                # Reject foreign sources on the raw bytes before paying for
+                # the full attribute decode
+                m = _SOURCE_RE.search(attr_bytes)
+                source_bytes = m.group(1) if m else b''
+                if total_count < 5:  # Show first 5 source names for debugging
+                    print(f"Workout {total_count}: source='{source_bytes.decode('utf-8')}'")
+                total_count += 1
+                if b'Apple Watch' not in source_bytes and b'Bharat' not in source_bytes:
+                    continue
                 apple_watch_count += 1
-                workout_data = self.extract_workout_data(workout)
+                attrs = _parse_attrs(attr_bytes)
+
+                body = match.group(2) or b''
+                stats = [_parse_attrs(m.group(1)) for m in _STAT_RE.finditer(body)]
+
+                elevation_str = None
+                for m in _META_RE.finditer(body):
+                    meta = _parse_attrs(m.group(1))
+                    if meta.get('key') == 'HKElevationAscended':
+                        elevation_str = meta.get('value', '0 cm')
+                        break
+
+                gpx_path = None
+                m = _FILEREF_RE.search(body)
+                if m:
+                    gpx_path = _parse_attrs(m.group(1)).get('path', '')
+
+                workout_data = self._workout_from_attrs(attrs, stats,
+                                                        elevation_str, gpx_path)
                 if workout_data:
                     workouts.append(workout_data)
-                    
-        print(f"Found {apple_watch_count} Apple Watch workouts")
-        print(f"Successfully parsed {len(workouts)} workouts with data")
-        
-        return workouts
-    
+
+            # No Workout rows in a well-formed-looking file means either a
+            # corrupt export or not an export at all; defer to the real
+            # parsers so errors surface as ET.ParseError
+            if total_count == 0:
+                return None
+
+            # Sanity check: every opening Workout tag must have been consumed,
+            # otherwise the layout defied our assumptions (mmap has no count
+            # method, hence the pattern sweep)
+            open_tags = sum(1 for _ in _WORKOUT_OPEN_RE.finditer(data))
+            if open_tags != total_count:
+                return None
+
+            return workouts, total_count, apple_watch_count
+        except (ValueError, UnicodeDecodeError):
+            # Malformed numbers or text in the scanned fields; let the XML
+            # rungs re-read the file and report properly
+            return None
+        finally:
+            data.close()
+
+    def _iter_workout_elements(self):
+        """Stream Workout elements from export.xml without building the full tree.
+
+        Apple Health exports routinely run to hundreds of MB, so loading the
+        whole DOM is a memory problem. We iterparse only the Workout subtrees
+        and free each one (plus any preceding siblings) as soon as the caller
+        is done with it.
+        """
+        try:
+            # huge_tree lifts libxml2's safety limits (multi-GB exports trip
+            # them); collect_ids skips ID-table bookkeeping we never use
+            for _, workout in LET.iterparse(str(self.export_xml),
+                                            tag='Workout', events=('end',),
+                                            huge_tree=True, collect_ids=False):
+                yield workout
+                # Free the subtree and everything parsed before it
+                workout.clear()
+                parent = workout.getparent()
+                if parent is not None:
+                    while workout.getprevious() is not None:
+                        del parent[0]
+        except LET.XMLSyntaxError as e:
+            raise ET.ParseError(str(e)) from e
+
     def extract_workout_data(self, workout_elem):
-        """Extract workout data from XML element"""
+        """Extract workout data from XML element.
+
+        One .iter() walk over the subtree instead of three descendant path
+        scans; find()/findall() re-parse their path expression on every
+        call, and the walk itself runs in C for both ElementTree and lxml
+        elements.
+        """
+        stats = []
+        elevation_str = None
+        gpx_path = None
+        for child in workout_elem.iter():
+            tag = child.tag
+            if tag == 'WorkoutStatistics':
+                stats.append(child.attrib)
+            elif tag == 'MetadataEntry':
+                if elevation_str is None and child.get('key') == 'HKElevationAscended':
+                    elevation_str = child.get('value', '0 cm')
+            elif tag == 'FileReference' and gpx_path is None:
+                gpx_path = child.get('path', '')
+
+        return self._workout_from_attrs(workout_elem.attrib, stats,
+                                        elevation_str, gpx_path)
+
+    def _workout_from_attrs(self, attrs, stats, elevation_str, gpx_path):
+        """Build a Workout from raw attribute mappings"""
         # Basic workout info
-        activity_type = workout_elem.get('workoutActivityType', '')
-        start_date = workout_elem.get('startDate', '')
-        end_date = workout_elem.get('endDate', '')
-        duration = float(workout_elem.get('duration', 0))
-        
+        activity_type = attrs.get('workoutActivityType', '')
+        start_date = attrs.get('startDate', '')
+        end_date = attrs.get('endDate', '')
+        duration = float(attrs.get('duration', 0))
+
         if not start_date or not end_date:
             return None
-            
+
         # Convert activity type
         sport = self.convert_activity_type(activity_type)
-        
+
         # Parse dates
         start_dt = self.parse_apple_date(start_date)
         end_dt = self.parse_apple_date(end_date)
-        
-        workout_data = {
-            'sport': sport,
-            'start_time': start_dt,
-            'end_time': end_dt,
-            'duration_minutes': duration,
-            'heart_rate': None,
-            'distance': None,
-            'calories': None,
-            'elevation_gain': None,
-            'gpx_file': None
-        }
-        
-        # Extract workout statistics
-        for stat in workout_elem.findall('.//WorkoutStatistics'):
-            stat_type = stat.get('type', '')
-            if 'HeartRate' in stat_type:
-                workout_data['heart_rate'] = {
-                    'avg': float(stat.get('average', 0)),
-                    'min': int(stat.get('minimum', 0)),
-                    'max': int(stat.get('maximum', 0))
-                }
-            elif 'DistanceWalkingRunning' in stat_type:
-                workout_data['distance'] = float(stat.get('sum', 0))
-            elif 'ActiveEnergyBurned' in stat_type:
-                workout_data['calories'] = float(stat.get('sum', 0))
-        
+
+        workout_data = Workout(
+            sport=sport,
+            start_time=start_dt,
+            end_time=end_dt,
+            duration_minutes=duration,
+        )
+
+        # Extract workout statistics: one dict build, then exact-key lookups
+        # instead of substring tests against every row
+        stats_by_type = {stat.get('type'): stat for stat in stats}
+
+        hr_stat = stats_by_type.get('HKQuantityTypeIdentifierHeartRate')
+        if hr_stat is not None:
+            workout_data.heart_rate = {
+                'avg': float(hr_stat.get('average', 0)),
+                'min': int(hr_stat.get('minimum', 0)),
+                'max': int(hr_stat.get('maximum', 0))
+            }
+
+        dist_stat = stats_by_type.get('HKQuantityTypeIdentifierDistanceWalkingRunning')
+        if dist_stat is not None:
+            workout_data.distance = float(dist_stat.get('sum', 0))
+
+        cal_stat = stats_by_type.get('HKQuantityTypeIdentifierActiveEnergyBurned')
+        if cal_stat is not None:
+            workout_data.calories = float(cal_stat.get('sum', 0))
+
         # Extract elevation gain
-        elevation_elem = workout_elem.find('.//MetadataEntry[@key="HKElevationAscended"]')
-        if elevation_elem is not None:
-            elevation_str = elevation_elem.get('value', '0 cm')
-            elevation_cm = float(elevation_str.replace(' cm', ''))
-            workout_data['elevation_gain'] = elevation_cm / 100  # Convert to meters
-        
+        if elevation_str is not None:
+            # Value looks like "500 cm"; split beats scanning for the suffix
+            elevation_cm = float(elevation_str.split(' ', 1)[0])
+            workout_data.elevation_gain = elevation_cm * 0.01  # Convert to meters
+
         # Find corresponding GPX file
-        route_elem = workout_elem.find('.//WorkoutRoute/FileReference')
-        if route_elem is not None:
-            gpx_path = route_elem.get('path', '')
-            if gpx_path.startswith('/workout-routes/'):
-                gpx_filename = gpx_path.replace('/workout-routes/', '')
-                workout_data['gpx_file'] = self.routes_dir / gpx_filename
-        
+        if gpx_path and gpx_path.startswith('/workout-routes/'):
+            gpx_filename = gpx_path.replace('/workout-routes/', '')
+            workout_data.gpx_file = self.routes_dir / gpx_filename
+
         return workout_data
     
     def convert_activity_type(self, apple_type):
         """Convert Apple workout type to TCX sport type"""
-        mapping = {
-            'HKWorkoutActivityTypeRunning': 'Running',
-            'HKWorkoutActivityTypeWalking': 'Walking',
-            'HKWorkoutActivityTypeCycling': 'Biking',
-            'HKWorkoutActivityTypeHiking': 'Other',
-            'HKWorkoutActivityTypeSwimming': 'Swimming',
-        }
-        return mapping.get(apple_type, 'Other')
+        return _ACTIVITY_MAP.get(apple_type, 'Other')
     
     def parse_apple_date(self, date_str):
         """Parse Apple Health date format to datetime"""
         # Format: "2022-10-06 20:04:10 +0100"
-        return datetime.fromisoformat(date_str)
+        return _parse_apple_date(date_str)
     
     def parse_gpx_file(self, gpx_file):
         """Parse GPX file and extract trackpoints"""
@@ -125,296 +662,379 @@ class AppleWorkoutConverter:
             return []
         
         try:
-            tree = ET.parse(gpx_file)
-            root = tree.getroot()
-            
-            # Handle GPX namespace
-            ns = {'gpx': 'http://www.topografix.com/GPX/1/1'}
-            
-            trackpoints = []
-            for trkpt in root.findall('.//gpx:trkpt', ns):
-                lat = float(trkpt.get('lat', 0))
-                lon = float(trkpt.get('lon', 0))
-                
-                # Extract elevation
-                ele_elem = trkpt.find('./gpx:ele', ns)
-                elevation = float(ele_elem.text) if ele_elem is not None else 0
-                
-                # Extract time
-                time_elem = trkpt.find('./gpx:time', ns)
-                if time_elem is not None:
-                    timestamp = datetime.fromisoformat(time_elem.text.replace('Z', '+00:00'))
-                else:
-                    continue
-                
-                # Extract extensions (speed, heart rate if available)
-                extensions = trkpt.find('./gpx:extensions', ns)
-                speed = None
-                if extensions is not None:
-                    speed_elem = extensions.find('./speed')
-                    if speed_elem is not None:
-                        speed = float(speed_elem.text)
-                
-                trackpoints.append({
-                    'lat': lat,
-                    'lon': lon,
-                    'elevation': elevation,
-                    'time': timestamp,
-                    'speed': speed
-                })
-            
-            return trackpoints
+            if LET is not None:
+                return self._parse_gpx_lxml(gpx_file)
+            return self._parse_gpx_et(gpx_file)
         except Exception as e:
             print(f"Error parsing GPX file {gpx_file}: {e}")
             return []
-    
+
+    def _parse_gpx_lxml(self, gpx_file):
+        """Stream trackpoints from a GPX file with libxml2's iterparse.
+
+        Long rides can contain tens of thousands of trkpt elements; streaming
+        keeps memory at O(one trackpoint) instead of O(whole file).
+        """
+        trkpt_tag = '{%s}trkpt' % _GPX_NS
+
+        lats, lons, eles, speeds = array('d'), array('d'), array('d'), array('d')
+        times = []
+        # Hoist the per-point lookups out of the loop body
+        lat_append, lon_append = lats.append, lons.append
+        ele_append, speed_append, time_append = eles.append, speeds.append, times.append
+        xp_ele, xp_time, xp_speed = self._xp_ele, self._xp_time, self._xp_speed
+        for _, trkpt in LET.iterparse(str(gpx_file), tag=trkpt_tag, events=('end',),
+                                      huge_tree=True):
+            time_text = xp_time(trkpt)
+            if time_text:
+                lat_append(float(trkpt.get('lat', 0)))
+                lon_append(float(trkpt.get('lon', 0)))
+
+                ele_text = xp_ele(trkpt)
+                ele_append(float(ele_text[0]) if ele_text else 0)
+
+                time_append(_clean_gpx_time(time_text[0]))
+
+                speed_text = xp_speed(trkpt)
+                speed_append(float(speed_text[0]) if speed_text else np.nan)
+
+            # Free the trackpoint and any already-processed siblings
+            trkpt.clear(keep_tail=False)
+            parent = trkpt.getparent()
+            if parent is not None:
+                while trkpt.getprevious() is not None:
+                    del parent[0]
+
+        return _build_track(lats, lons, eles, times, speeds)
+
+    def _parse_gpx_et(self, gpx_file):
+        """Stream trackpoints with stdlib ElementTree.iterparse (no lxml)"""
+        gpx_ns = '{%s}' % _GPX_NS
+        trkpt_tag = gpx_ns + 'trkpt'
+
+        lats, lons, eles, speeds = array('d'), array('d'), array('d'), array('d')
+        times = []
+        root = None
+        for event, elem in ET.iterparse(gpx_file, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+            elif elem.tag == trkpt_tag:
+                time_elem = elem.find(gpx_ns + 'time')
+                if time_elem is not None:
+                    lats.append(float(elem.get('lat', 0)))
+                    lons.append(float(elem.get('lon', 0)))
+
+                    ele_elem = elem.find(gpx_ns + 'ele')
+                    eles.append(float(ele_elem.text) if ele_elem is not None else 0)
+
+                    times.append(_clean_gpx_time(time_elem.text))
+
+                    extensions = elem.find(gpx_ns + 'extensions')
+                    speed = np.nan
+                    if extensions is not None:
+                        speed_elem = extensions.find('./speed')
+                        if speed_elem is not None:
+                            speed = float(speed_elem.text)
+                    speeds.append(speed)
+
+                elem.clear()
+                root.clear()
+
+        return _build_track(lats, lons, eles, times, speeds)
+
     def create_tcx(self, workout_data):
         """Create TCX format XML for a single workout"""
-        # TCX root structure
-        tcx = ET.Element('TrainingCenterDatabase')
-        tcx.set('xmlns', 'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2')
-        tcx.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        tcx.set('xsi:schemaLocation', 
-                'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2 '
-                'http://www.garmin.com/xmlschemas/TrainingCenterDatabasev2.xsd')
-        
-        # Activities section
-        activities = ET.SubElement(tcx, 'Activities')
-        activity = ET.SubElement(activities, 'Activity', Sport=workout_data['sport'])
-        
-        # Activity ID (start time)
-        activity_id = ET.SubElement(activity, 'Id')
-        activity_id.text = workout_data['start_time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-        
-        # Lap
-        lap = ET.SubElement(activity, 'Lap', StartTime=workout_data['start_time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
-        
-        # Lap totals
-        total_time = ET.SubElement(lap, 'TotalTimeSeconds')
-        total_time.text = str(workout_data['duration_minutes'] * 60)
+        return self._build_tcx(workout_data, include_hr=True)
+
+    def create_tcx_no_hr(self, workout_data):
+        """Create TCX format XML for a workout without heart rate data"""
+        return self._build_tcx(workout_data, include_hr=False)
+
+    def _build_tcx(self, workout_data, include_hr):
+        """Build the TCX element tree shared by both create_tcx variants"""
+        hr = workout_data['heart_rate'] if include_hr else None
+        # Loop-invariant: the average HR never changes within a workout
+        avg_hr_text = str(int(hr['avg'])) if hr else None
+
+        # Stamp the per-workout fields onto a copy of the shared skeleton
+        tcx = copy.deepcopy(_TCX_TEMPLATE)
+        activity = tcx[0][0]
+        activity.set('Sport', workout_data['sport'])
+
+        start_iso = _iso_utc(workout_data['start_time'])
+        activity[0].text = start_iso  # Id
+
+        lap = activity[1]
+        lap.set('StartTime', start_iso)
+        lap[0].text = str(workout_data['duration_minutes'] * 60)  # TotalTimeSeconds
         
+        # Parse GPS trackpoints (also used for the distance fallback below)
+        trackpoints = self.parse_gpx_file(workout_data['gpx_file'])
+
         if workout_data['distance']:
             distance_m = ET.SubElement(lap, 'DistanceMeters')
             distance_m.text = str(workout_data['distance'] * 1000)  # Convert km to m
+        elif len(trackpoints):
+            # No distance statistic in the export; derive it from the route
+            distance_m = ET.SubElement(lap, 'DistanceMeters')
+            distance_m.text = f"{_total_distance_m(trackpoints.lat, trackpoints.lon):.1f}"
         
         if workout_data['calories']:
             calories = ET.SubElement(lap, 'Calories')
             calories.text = str(int(workout_data['calories']))
         
         # Heart rate summary
-        if workout_data['heart_rate']:
+        if hr:
             avg_hr = ET.SubElement(lap, 'AverageHeartRateBpm')
             avg_hr_value = ET.SubElement(avg_hr, 'Value')
-            avg_hr_value.text = str(int(workout_data['heart_rate']['avg']))
+            avg_hr_value.text = avg_hr_text
             
             max_hr = ET.SubElement(lap, 'MaximumHeartRateBpm')
             max_hr_value = ET.SubElement(max_hr, 'Value')
-            max_hr_value.text = str(workout_data['heart_rate']['max'])
-        
-        # Parse GPS trackpoints
-        trackpoints = self.parse_gpx_file(workout_data['gpx_file'])
+            max_hr_value.text = str(hr['max'])
         
-        if trackpoints:
+        if len(trackpoints):
             track = ET.SubElement(lap, 'Track')
-            
-            for i, tp in enumerate(trackpoints):
+
+            # Format whole columns at once; NumPy's printf loop amortizes the
+            # per-value Python float->str cost across the array
+            lat_s, lon_s, ele_s = _format_position_columns(trackpoints)
+            time_s = _format_time_column(trackpoints)
+
+            for i in range(len(trackpoints)):
                 trackpoint = ET.SubElement(track, 'Trackpoint')
-                
+
                 # Time
                 time_elem = ET.SubElement(trackpoint, 'Time')
-                time_elem.text = tp['time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-                
+                time_elem.text = time_s[i]
+
                 # Position
                 position = ET.SubElement(trackpoint, 'Position')
                 lat_elem = ET.SubElement(position, 'LatitudeDegrees')
-                lat_elem.text = str(tp['lat'])
+                lat_elem.text = lat_s[i]
                 lon_elem = ET.SubElement(position, 'LongitudeDegrees')
-                lon_elem.text = str(tp['lon'])
-                
+                lon_elem.text = lon_s[i]
+
                 # Altitude
                 alt_elem = ET.SubElement(trackpoint, 'AltitudeMeters')
-                alt_elem.text = str(tp['elevation'])
-                
-                # Heart rate (interpolate from workout average if not in GPX)
-                if workout_data['heart_rate']:
+                alt_elem.text = ele_s[i]
+
+                # Heart rate (interpolated from workout average)
+                if avg_hr_text:
                     hr_elem = ET.SubElement(trackpoint, 'HeartRateBpm')
                     hr_value = ET.SubElement(hr_elem, 'Value')
-                    # Use average HR for all points (could be improved with actual HR data)
-                    hr_value.text = str(int(workout_data['heart_rate']['avg']))
-        
-        # Creator/device info
-        creator = ET.SubElement(activity, 'Creator')
-        creator.set('xsi:type', 'Device_t')
-        name_elem = ET.SubElement(creator, 'Name')
-        name_elem.text = 'Apple Watch'
-        unit_id = ET.SubElement(creator, 'UnitId')
-        unit_id.text = '0'
-        product_id = ET.SubElement(creator, 'ProductID')
-        product_id.text = '0'
+                    hr_value.text = avg_hr_text
         
+        # Creator/device info already sits in the skeleton, after the Lap
         return tcx
-    
-    def create_tcx_no_hr(self, workout_data):
-        """Create TCX format XML for a workout without heart rate data"""
-        # TCX root structure
-        tcx = ET.Element('TrainingCenterDatabase')
-        tcx.set('xmlns', 'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2')
-        tcx.set('xmlns:xsi', 'http://www.w3.org/2001/XMLSchema-instance')
-        tcx.set('xsi:schemaLocation', 
-                'http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2 '
-                'http://www.garmin.com/xmlschemas/TrainingCenterDatabasev2.xsd')
-        
-        # Activities section
-        activities = ET.SubElement(tcx, 'Activities')
-        activity = ET.SubElement(activities, 'Activity', Sport=workout_data['sport'])
-        
-        # Activity ID (start time)
-        activity_id = ET.SubElement(activity, 'Id')
-        activity_id.text = workout_data['start_time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-        
-        # Lap
-        lap = ET.SubElement(activity, 'Lap', StartTime=workout_data['start_time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ'))
-        
-        # Lap totals
-        total_time = ET.SubElement(lap, 'TotalTimeSeconds')
-        total_time.text = str(workout_data['duration_minutes'] * 60)
-        
+
+    def render_tcx(self, workout_data):
+        """Render a workout as TCX bytes with a direct string writer.
+
+        The Element-based builders allocate six-plus Elements per trackpoint
+        and then pay for an indent pass and a tree-walking serializer. The
+        TCX schema we emit is fixed, so the conversion path writes the
+        document text in a single pass instead; create_tcx/create_tcx_no_hr
+        remain for callers that want a tree to inspect.
+        """
+        hr = workout_data['heart_rate']
+        avg_hr_text = str(int(hr['avg'])) if hr else None
+        start_iso = _iso_utc(workout_data['start_time'])
+
+        parts = [
+            "<?xml version='1.0' encoding='utf-8'?>\n"
+            '<TrainingCenterDatabase'
+            f' xmlns="{_TCX_NS}"'
+            f' xmlns:xsi="{_XSI_NS}"'
+            f' xsi:schemaLocation="{_TCX_NS} {_TCX_SCHEMA}">\n'
+            '  <Activities>\n'
+            f'    <Activity Sport="{workout_data["sport"]}">\n'
+            f'      <Id>{start_iso}</Id>\n'
+            f'      <Lap StartTime="{start_iso}">\n'
+            f'        <TotalTimeSeconds>{workout_data["duration_minutes"] * 60}</TotalTimeSeconds>\n'
+        ]
+        append = parts.append
+
+        trackpoints = self.parse_gpx_file(workout_data['gpx_file'])
         if workout_data['distance']:
-            distance_m = ET.SubElement(lap, 'DistanceMeters')
-            distance_m.text = str(workout_data['distance'] * 1000)  # Convert km to m
-        
+            append(f'        <DistanceMeters>{workout_data["distance"] * 1000}</DistanceMeters>\n')
+        elif len(trackpoints):
+            # No distance statistic in the export; derive it from the route
+            append(f'        <DistanceMeters>{_total_distance_m(trackpoints.lat, trackpoints.lon):.1f}</DistanceMeters>\n')
         if workout_data['calories']:
-            calories = ET.SubElement(lap, 'Calories')
-            calories.text = str(int(workout_data['calories']))
-        
-        # Parse GPS trackpoints
-        trackpoints = self.parse_gpx_file(workout_data['gpx_file'])
-        
-        if trackpoints:
-            track = ET.SubElement(lap, 'Track')
-            
-            for i, tp in enumerate(trackpoints):
-                trackpoint = ET.SubElement(track, 'Trackpoint')
-                
-                # Time
-                time_elem = ET.SubElement(trackpoint, 'Time')
-                time_elem.text = tp['time'].strftime('%Y-%m-%dT%H:%M:%S.%fZ')
-                
-                # Position
-                position = ET.SubElement(trackpoint, 'Position')
-                lat_elem = ET.SubElement(position, 'LatitudeDegrees')
-                lat_elem.text = str(tp['lat'])
-                lon_elem = ET.SubElement(position, 'LongitudeDegrees')
-                lon_elem.text = str(tp['lon'])
-                
-                # Altitude
-                alt_elem = ET.SubElement(trackpoint, 'AltitudeMeters')
-                alt_elem.text = str(tp['elevation'])
-        
-        # Creator/device info
-        creator = ET.SubElement(activity, 'Creator')
-        creator.set('xsi:type', 'Device_t')
-        name_elem = ET.SubElement(creator, 'Name')
-        name_elem.text = 'Apple Watch'
-        unit_id = ET.SubElement(creator, 'UnitId')
-        unit_id.text = '0'
-        product_id = ET.SubElement(creator, 'ProductID')
-        product_id.text = '0'
-        
-        return tcx
-    
-    def convert_workouts(self, output_dir=None, activity_filter=None):
-        """Convert all Apple Watch workouts to TCX files"""
+            append(f'        <Calories>{int(workout_data["calories"])}</Calories>\n')
+        if hr:
+            append('        <AverageHeartRateBpm>\n'
+                   f'          <Value>{avg_hr_text}</Value>\n'
+                   '        </AverageHeartRateBpm>\n'
+                   '        <MaximumHeartRateBpm>\n'
+                   f'          <Value>{hr["max"]}</Value>\n'
+                   '        </MaximumHeartRateBpm>\n')
+
+        if len(trackpoints):
+            lat_s, lon_s, ele_s = _format_position_columns(trackpoints)
+            time_s = _format_time_column(trackpoints)
+            hr_xml = f'<HeartRateBpm><Value>{avg_hr_text}</Value></HeartRateBpm>' if hr else ''
+
+            append('        <Track>\n')
+            for i in range(len(trackpoints)):
+                append(f'          <Trackpoint><Time>{time_s[i]}</Time>'
+                       f'<Position><LatitudeDegrees>{lat_s[i]}</LatitudeDegrees>'
+                       f'<LongitudeDegrees>{lon_s[i]}</LongitudeDegrees></Position>'
+                       f'<AltitudeMeters>{ele_s[i]}</AltitudeMeters>{hr_xml}</Trackpoint>\n')
+            append('        </Track>\n')
+
+        append('      </Lap>\n'
+               '      <Creator xsi:type="Device_t">\n'
+               '        <Name>Apple Watch</Name>\n'
+               '        <UnitId>0</UnitId>\n'
+               '        <ProductID>0</ProductID>\n'
+               '      </Creator>\n'
+               '    </Activity>\n'
+               '  </Activities>\n'
+               '</TrainingCenterDatabase>\n')
+
+        return ''.join(parts).encode('utf-8')
+
+    def convert_workouts(self, output_dir=None, activity_filter=None,
+                         gzip_output=False):
+        """Convert all Apple Watch workouts to TCX files.
+
+        Returns the list of written file paths, so callers can post-process
+        the output without rescanning the directory tree. With gzip_output
+        the files are written as .tcx.gz (accepted by Garmin Connect);
+        GPS-heavy TCX compresses roughly 8-10x.
+        """
         if output_dir is None:
             output_dir = self.export_dir / "tcx_files"
         else:
             output_dir = Path(output_dir)
-        
+
         output_dir.mkdir(exist_ok=True)
-        
-        workouts = self.parse_apple_workouts()
-        
-        # Filter by activity type if specified
-        if activity_filter:
-            workouts = [w for w in workouts if activity_filter.lower() in w['sport'].lower()]
-        
+
         # Create separate folder for workouts without HR data
         no_hr_dir = output_dir / "no_heart_rate"
         no_hr_dir.mkdir(exist_ok=True)
-        
+
+        activity_filter = activity_filter.lower() if activity_filter else None
+
+        # Stream workouts straight off the parser, laying out target paths as
+        # they arrive (directory creation stays in the parent); the per-workout
+        # GPX parse + TCX write runs in the workers
+        jobs = []
+        for workout in self.iter_apple_workouts():
+            # Filter by activity type if specified
+            if activity_filter and activity_filter not in workout['sport'].lower():
+                continue
+            start_time = workout['start_time']
+            base_dir = output_dir if workout['heart_rate'] else no_hr_dir
+            year_month_dir = base_dir / str(start_time.year) / f"{start_time.month:02d}"
+            self._ensure_dir(year_month_dir)
+
+            start_time_str = start_time.strftime('%Y-%m-%d_%H%M%S')
+            filename = f"{start_time_str}_{workout['sport']}.tcx"
+            jobs.append((workout, str(year_month_dir / filename), gzip_output))
+
+        results = self._run_conversions(jobs)
+
+        written = []
         converted_count = 0
         no_hr_count = 0
-        
-        for workout in workouts:
+        for (workout, output_file, _), (ok, error) in zip(jobs, results):
+            if not ok:
+                kind = 'workout' if workout['heart_rate'] else 'no-HR workout'
+                print(f"Error converting {kind} from {workout['start_time']}: {error}")
+                continue
+
+            written.append(Path(output_file + '.gz' if gzip_output else output_file))
+
             if not workout['heart_rate']:
-                # Save workout without HR data to separate folder
-                try:
-                    tcx = self.create_tcx_no_hr(workout)
-                    
-                    # Organize no-HR workouts by year/month too
-                    start_time = workout['start_time']
-                    year_month_no_hr_dir = no_hr_dir / str(start_time.year) / f"{start_time.month:02d}"
-                    year_month_no_hr_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    start_time_str = start_time.strftime('%Y-%m-%d_%H%M%S')
-                    filename = f"{start_time_str}_{workout['sport']}.tcx"
-                    output_file = year_month_no_hr_dir / filename
-                    tree = ET.ElementTree(tcx)
-                    ET.indent(tree, space="  ", level=0)
-                    tree.write(output_file, encoding='utf-8', xml_declaration=True)
-                    no_hr_count += 1
-                except Exception as e:
-                    print(f"Error converting no-HR workout from {workout['start_time']}: {e}")
+                no_hr_count += 1
                 continue
-                
-            try:
-                tcx = self.create_tcx(workout)
-                
-                # Generate filename and organize by year/month
-                start_time = workout['start_time']
-                year_month_dir = output_dir / str(start_time.year) / f"{start_time.month:02d}"
-                year_month_dir.mkdir(parents=True, exist_ok=True)
-                
-                start_time_str = start_time.strftime('%Y-%m-%d_%H%M%S')
-                filename = f"{start_time_str}_{workout['sport']}.tcx"
-                
-                # Write TCX file
-                output_file = year_month_dir / filename
-                tree = ET.ElementTree(tcx)
-                ET.indent(tree, space="  ", level=0)
-                tree.write(output_file, encoding='utf-8', xml_declaration=True)
-                
-                print(f"Converted: {filename}")
-                print(f"  Sport: {workout['sport']}")
-                print(f"  Duration: {workout['duration_minutes']:.1f} min")
-                if workout['distance']:
-                    print(f"  Distance: {workout['distance']:.2f} km")
-                if workout['heart_rate']:
-                    hr = workout['heart_rate']
-                    print(f"  HR: {hr['avg']:.0f} avg, {hr['min']}-{hr['max']} range")
-                print()
-                
-                converted_count += 1
-                
-            except Exception as e:
-                print(f"Error converting workout from {workout['start_time']}: {e}")
-        
+
+            print(f"Converted: {Path(output_file).name}")
+            print(f"  Sport: {workout['sport']}")
+            print(f"  Duration: {workout['duration_minutes']:.1f} min")
+            if workout['distance']:
+                print(f"  Distance: {workout['distance']:.2f} km")
+            hr = workout['heart_rate']
+            print(f"  HR: {hr['avg']:.0f} avg, {hr['min']}-{hr['max']} range")
+            print()
+
+            converted_count += 1
+
         print(f"\nSummary:")
         print(f"  Converted {converted_count} workouts WITH heart rate to {output_dir}")
         print(f"  Converted {no_hr_count} workouts WITHOUT heart rate to {no_hr_dir}")
-        print(f"  Total: {converted_count + no_hr_count} workouts converted")
-        return converted_count + no_hr_count
+        print(f"  Total: {len(written)} workouts converted")
+        return written
+
+    def _ensure_dir(self, path):
+        """mkdir -p with memoization; most workouts share a year/month dir,
+        so skip the stat+mkdir syscalls after the first sighting"""
+        if path in self._mkdir_cache:
+            return
+        path.mkdir(parents=True, exist_ok=True)
+        self._mkdir_cache.add(path)
+
+    def _run_conversions(self, jobs):
+        """Convert (workout, output_file) jobs, in parallel when worthwhile.
+
+        Each job is independent (distinct GPX input, distinct TCX output), so
+        the work splits cleanly across cores. Small batches stay serial to
+        avoid process start-up costing more than it saves.
+        """
+        global _WORKER
+        if len(jobs) < _PARALLEL_THRESHOLD:
+            _WORKER = self
+            return [_convert_one(job) for job in jobs]
+
+        with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                 initializer=_init_worker,
+                                 initargs=(str(self.export_dir),)) as executor:
+            return list(executor.map(_convert_one, jobs, chunksize=8))
+
+# Converter used by _convert_one; set by _init_worker in each pool process
+# (or pointed at the live converter for serial runs)
+_WORKER = None
+_PARALLEL_THRESHOLD = 8
+
+
+def _init_worker(export_dir):
+    global _WORKER
+    _WORKER = AppleWorkoutConverter(export_dir)
+
+
+def _convert_one(job):
+    """Parse the GPX and write one TCX file; returns (ok, error message)"""
+    workout, output_file, use_gzip = job
+    try:
+        buf = _WORKER.render_tcx(workout)
+        if use_gzip:
+            with gzip.open(output_file + '.gz', 'wb', compresslevel=6) as f:
+                f.write(buf)
+        else:
+            # The document is already one bytes object; a single write call
+            # keeps the I/O to one syscall per file
+            Path(output_file).write_bytes(buf)
+        return (True, None)
+    except Exception as e:
+        return (False, str(e))
+
 
 def main():
     parser = argparse.ArgumentParser(description='Convert Apple Watch workouts to TCX for Garmin Connect')
     parser.add_argument('export_dir', help='Path to Apple Health export directory')
     parser.add_argument('--output', '-o', help='Output directory for TCX files')
     parser.add_argument('--activity', '-a', help='Filter by activity type (running, walking, etc.)')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Write gzip-compressed .tcx.gz files')
     
     args = parser.parse_args()
     
     converter = AppleWorkoutConverter(args.export_dir)
-    converter.convert_workouts(args.output, args.activity)
+    converter.convert_workouts(args.output, args.activity, gzip_output=args.gzip)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,20 +1,28 @@
 #!/usr/bin/env python3
 """
 Simple test runner for the Apple Health TCX converter
-No external dependencies - uses only Python standard library
+Requires NumPy (the converter imports it); lxml is optional
 """
 
 import unittest
 import sys
 import os
 
+# Test modules listed explicitly: loading by name skips the filesystem walk
+# and pattern matching that loader.discover() repeats on every invocation
+TEST_MODULES = [
+    'test_convert_apple_workouts',
+]
+
 def run_tests():
     """Run all tests and display results"""
-    # Discover and run tests
+    # Load the known test modules directly
     loader = unittest.TestLoader()
     start_dir = os.path.dirname(os.path.abspath(__file__))
-    suite = loader.discover(start_dir, pattern='test_*.py')
-    
+    if start_dir not in sys.path:
+        sys.path.insert(0, start_dir)
+    suite = loader.loadTestsFromNames(TEST_MODULES)
+
     # Run tests with verbose output
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
@@ -157,6 +157,31 @@ class TestAppleWorkoutConverter(unittest.TestCase):
         self.assertIsNone(workout2['heart_rate'])
         self.assertEqual(workout2['distance'], 3.0)
 
+    def test_scan_workouts_fast(self):
+        """Test the byte-regex fast path parses workouts without falling back"""
+        scanned = self.converter._scan_workouts_fast()
+        
+        # The fast path itself must yield results, not defer to the XML rungs
+        self.assertIsNotNone(scanned)
+        workouts, total_count, apple_watch_count = scanned
+        self.assertEqual(total_count, 3)
+        self.assertEqual(apple_watch_count, 2)
+        self.assertEqual(len(workouts), 2)
+        self.assertEqual(workouts[0]['sport'], 'Running')
+        self.assertEqual(workouts[0]['heart_rate']['avg'], 150.0)
+        self.assertEqual(workouts[1]['sport'], 'Walking')
+
+    def test_scan_workouts_fast_rejects_workoutless_xml(self):
+        """Test that an export with no Workout rows defers to the XML parsers"""
+        with open(self.export_dir / "export.xml", 'w') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<HealthData></HealthData>\n')
+        
+        converter = AppleWorkoutConverter(self.export_dir)
+        
+        # Zero matches must not read as an empty success; corrupt or foreign
+        # files have to fall through so the real parsers can raise
+        self.assertIsNone(converter._scan_workouts_fast())
+
     def test_convert_activity_type(self):
         """Test activity type conversion"""
         test_cases = [
@@ -268,10 +293,12 @@ class TestAppleWorkoutConverter(unittest.TestCase):
         """Test full workout conversion integration"""
         output_dir = self.test_dir / "tcx_output"
         
-        result_count = self.converter.convert_workouts(output_dir)
+        written_files = self.converter.convert_workouts(output_dir)
         
         # Should convert both workouts
-        self.assertEqual(result_count, 2)
+        self.assertEqual(len(written_files), 2)
+        for path in written_files:
+            self.assertTrue(path.exists())
         
         # Check directory structure - workouts should be organized by year/month
         self.assertTrue(output_dir.exists())
@@ -305,15 +332,13 @@ class TestAppleWorkoutConverter(unittest.TestCase):
         output_dir = self.test_dir / "tcx_output_filtered"
         
         # Filter for running only
-        result_count = self.converter.convert_workouts(output_dir, "running")
-        
-        # Should only convert running workout
-        self.assertEqual(result_count, 1)
+        written_files = self.converter.convert_workouts(output_dir, "running")
         
-        # Check only running workout was converted
-        tcx_files = list(output_dir.rglob("*.tcx"))
-        self.assertEqual(len(tcx_files), 1)
-        self.assertIn("Running", tcx_files[0].name)
+        # Should only convert running workout; the returned paths make the
+        # rglob scan of the output tree unnecessary
+        self.assertEqual(len(written_files), 1)
+        self.assertTrue(written_files[0].exists())
+        self.assertIn("Running", written_files[0].name)
 
     def test_invalid_export_xml(self):
         """Test handling of invalid export.xml"""